@@ -6,13 +6,26 @@ Tablo database file stored on an external drive. This file is only
 updated when the user presses the reset button, so it can often
 be out of date.
 """
+import atexit
 import json
 import pathlib
 import sqlite3
 from collections import namedtuple
 from contextlib import closing
 from dataclasses import InitVar, asdict, dataclass, field
-from typing import ClassVar, Dict, Literal
+from functools import lru_cache, partial
+from typing import (
+    Any,
+    Callable,
+    ClassVar,
+    Dict,
+    Iterable,
+    Iterator,
+    Literal,
+    Mapping,
+    Optional,
+    Sequence,
+)
 
 from dataclasses_json import LetterCase, dataclass_json
 from loguru import logger
@@ -45,17 +58,47 @@ CHANNEL_FIELDS = (
     'resolutionTitle',
 )
 
+_RECORDING_COLS = ', '.join(RECORDING_FIELDS)
+_CHANNEL_COLS = ', '.join(CHANNEL_FIELDS)
+_SELECT_ALL_RECORDINGS = (
+    f'SELECT {_RECORDING_COLS} FROM Recording' +  # noqa: S608
+    ' WHERE ID > 0 AND LENGTH(DateDeleted) < 1 ORDER BY title'
+)
+_SELECT_ONE_RECORDING = (
+    f'SELECT {_RECORDING_COLS} FROM Recording' +  # noqa: S608
+    ' WHERE ID = ? AND LENGTH(DateDeleted) < 1'
+)
+_SELECT_SOME_RECORDINGS = (
+    f'SELECT {_RECORDING_COLS} FROM Recording' +  # noqa: S608
+    ' WHERE ID IN ({0}) AND LENGTH(DateDeleted) < 1'
+)
+_SELECT_ALL_CHANNELS = (
+    f'SELECT {_CHANNEL_COLS} FROM Channel ORDER BY ID'  # noqa: S608
+)
+_SELECT_ONE_CHANNEL = (
+    f'SELECT {_CHANNEL_COLS} FROM Channel WHERE ID = ?'  # noqa: S608
+)
+_SELECT_SOME_CHANNELS = (
+    f'SELECT {_CHANNEL_COLS} FROM Channel WHERE ID IN ({{0}})'  # noqa: S608
+)
+_MAX_SQL_PARAMS = 999  # SQLITE_MAX_VARIABLE_NUMBER before sqlite 3.32
+
 
 def make_uri(db_file: pathlib.Path) -> str:
     """Create a sqlite URI from a db filename."""
     return f'{URI_PRE}{db_file}{URI_POST}'
 
 
+@lru_cache(maxsize=None)
+def _row_cls(fields: tuple[str, ...]) -> type:
+    """Return the (cached) namedtuple class for a set of column names."""
+    return namedtuple('Row', fields)
+
+
 def namedtuple_factory(cursor, row):
     """A row factory for sqlite3."""
-    fields = [column[0] for column in cursor.description]
-    cls_type = namedtuple('Row', fields)
-    return cls_type._make(row)  # noqa: WPS437
+    fields = tuple(column[0] for column in cursor.description)
+    return _row_cls(fields)._make(row)  # noqa: WPS437
 
 
 def dict_factory(cursor, row):
@@ -64,81 +107,197 @@ def dict_factory(cursor, row):
     return dict(zip(fields, row))
 
 
-def read_recordings(db_file: pathlib.Path) -> list[dict]:
+_conn_cache: dict[str, sqlite3.Connection] = {}
+
+
+def _get_conn(
+    db_file: pathlib.Path,
+    conn: Optional[sqlite3.Connection] = None,
+) -> sqlite3.Connection:
+    """Return conn if given, else the (cached) connection to the Tablo DB."""
+    if conn is not None:
+        return conn
+    uri = make_uri(db_file)
+    cached = _conn_cache.get(uri)
+    if cached is None:
+        cached = sqlite3.connect(
+            database=uri,
+            uri=True,
+            check_same_thread=False,
+            isolation_level=None,  # autocommit: no implicit BEGIN/COMMIT
+        )
+        cached.row_factory = sqlite3.Row
+        cached.execute('PRAGMA query_only=ON')
+        cached.execute('PRAGMA cache_size=-64000')
+        cached.execute('PRAGMA temp_store=MEMORY')
+        _conn_cache[uri] = cached
+    return cached
+
+
+def _cursor(
+    db_file: pathlib.Path,
+    conn: Optional[sqlite3.Connection] = None,
+) -> 'closing[sqlite3.Cursor]':
+    """Open a cursor on conn, or on the cached connection to db_file."""
+    return closing(_get_conn(db_file, conn).cursor())
+
+
+@atexit.register
+def _close_connections() -> None:
+    """Close all cached connections to the Tablo DB."""
+    for conn in _conn_cache.values():
+        conn.close()
+    _conn_cache.clear()
+
+
+def iter_recordings(
+    db_file: pathlib.Path,
+    conn: Optional[sqlite3.Connection] = None,
+) -> Iterator[sqlite3.Row]:
+    """Reads the Tablo DB and yields the records from Recording."""
+    with _cursor(db_file, conn) as cur:
+        yield from cur.execute(_SELECT_ALL_RECORDINGS)
+
+
+def read_recordings(
+    db_file: pathlib.Path,
+    conn: Optional[sqlite3.Connection] = None,
+) -> list[sqlite3.Row]:
     """Reads the Tablo DB and returns a list of records from Recording."""
-    query = (
-        'SELECT ' +  # noqa: S608
-        ', '.join(RECORDING_FIELDS) +
-        ' FROM Recording' +
-        ' WHERE ID > 0' +
-        ' AND LENGTH(DateDeleted) < 1' +
-        ' ORDER BY title'
-    )
-    with closing(sqlite3.connect(database=make_uri(db_file), uri=True)) as conn:
-        with conn:  # as transaction
-            conn.row_factory = dict_factory
-            with closing(conn.cursor()) as cur:
-                all_rows = cur.execute(query).fetchall()
+    return list(iter_recordings(db_file, conn))
 
-    return all_rows
 
-
-def read_one_recording(db_file: pathlib.Path, r_id: int) -> dict:
+def read_one_recording(
+    db_file: pathlib.Path,
+    r_id: int,
+    conn: Optional[sqlite3.Connection] = None,
+) -> sqlite3.Row:
     """Reads the Tablo DB and returns a one record from Recording."""
-    query = (
-        'SELECT ' +  # noqa: S608
-        ', '.join(RECORDING_FIELDS) +
-        ' FROM Recording' +
-        ' WHERE ID = ' +
-        str(r_id) +
-        ' AND LENGTH(DateDeleted) < 1' +
-        ' ORDER BY title'
-    )
-    with closing(sqlite3.connect(database=make_uri(db_file), uri=True)) as conn:
-        with conn:  # as transaction
-            conn.row_factory = dict_factory
-            with closing(conn.cursor()) as cur:
-                row = cur.execute(query).fetchone()
+    with _cursor(db_file, conn) as cur:
+        row = cur.execute(_SELECT_ONE_RECORDING, (r_id,)).fetchone()
 
     return row
 
 
-def read_channels(db_file: pathlib.Path) -> list[dict]:
+def _read_by_ids(
+    conn: sqlite3.Connection,
+    query: str,
+    ids: Iterable[int],
+) -> dict[int, sqlite3.Row]:
+    """Run an `ID IN (...)` query in chunks, returning the rows by ID."""
+    unique_ids = list(dict.fromkeys(ids))
+    rows = {}
+    with closing(conn.cursor()) as cur:
+        for start in range(0, len(unique_ids), _MAX_SQL_PARAMS):
+            chunk = unique_ids[start:start + _MAX_SQL_PARAMS]
+            chunk_query = query.format(', '.join('?' * len(chunk)))
+            rows.update(index_by_id(cur.execute(chunk_query, chunk)))
+
+    return rows
+
+
+def read_some_recordings(
+    db_file: pathlib.Path,
+    r_ids: Iterable[int],
+    conn: Optional[sqlite3.Connection] = None,
+) -> dict[int, sqlite3.Row]:
+    """Reads the Tablo DB and returns the selected records by ID."""
+    conn = _get_conn(db_file, conn)
+    return _read_by_ids(conn, _SELECT_SOME_RECORDINGS, r_ids)
+
+
+def iter_channels(
+    db_file: pathlib.Path,
+    conn: Optional[sqlite3.Connection] = None,
+) -> Iterator[sqlite3.Row]:
+    """Reads the Tablo DB and yields the records from Channel."""
+    with _cursor(db_file, conn) as cur:
+        yield from cur.execute(_SELECT_ALL_CHANNELS)
+
+
+def read_channels(
+    db_file: pathlib.Path,
+    conn: Optional[sqlite3.Connection] = None,
+) -> list[sqlite3.Row]:
     """Reads the Tablo DB and returns a list of records from Channel."""
-    query = (
-        'SELECT ' +  # noqa: S608
-        ', '.join(CHANNEL_FIELDS) +
-        ' FROM Channel' +
-        ' ORDER BY ID'
-    )
-    with closing(sqlite3.connect(database=make_uri(db_file), uri=True)) as conn:
-        with conn:  # as transaction
-            conn.row_factory = dict_factory
-            with closing(conn.cursor()) as cur:
-                all_rows = cur.execute(query).fetchall()
+    return list(iter_channels(db_file, conn))
 
-    return all_rows
 
+def read_some_channels(
+    db_file: pathlib.Path,
+    chan_ids: Iterable[int],
+    conn: Optional[sqlite3.Connection] = None,
+) -> dict[int, sqlite3.Row]:
+    """Reads the Tablo DB and returns the selected channels by ID."""
+    conn = _get_conn(db_file, conn)
+    return _read_by_ids(conn, _SELECT_SOME_CHANNELS, chan_ids)
 
-def read_one_channel(db_file: pathlib.Path, chan_id: int) -> dict:
+
+def read_one_channel(
+    db_file: pathlib.Path,
+    chan_id: int,
+    conn: Optional[sqlite3.Connection] = None,
+) -> sqlite3.Row:
     """Reads the Tablo DB and returns a list of records from Channel."""
-    query = (
-        'SELECT ' +  # noqa: S608
-        ', '.join(CHANNEL_FIELDS) +
-        ' FROM Channel ' +
-        ' WHERE ID = ' +
-        str(chan_id) +
-        ' ORDER BY ID'
-    )
-    with closing(sqlite3.connect(database=make_uri(db_file), uri=True)) as conn:
-        with conn:  # as transaction
-            conn.row_factory = dict_factory
-            with closing(conn.cursor()) as cur:
-                row = cur.execute(query).fetchone()
+    with _cursor(db_file, conn) as cur:
+        row = cur.execute(_SELECT_ONE_CHANNEL, (chan_id,)).fetchone()
 
     return row
 
 
+@dataclass
+class RecordingTable(object):
+    """Column-oriented copy of the Recording table, indexed by ID."""
+
+    cols: dict[str, list] = field(
+        default_factory=lambda: {name: [] for name in RECORDING_FIELDS},
+    )
+    _id_to_idx: dict[int, int] = field(
+        init=False,
+        repr=False,
+        default_factory=dict,
+    )
+
+    @property
+    def ids(self) -> list[int]:
+        """The recording IDs, in table order."""
+        return self.cols[ID]
+
+    def reindex(self) -> None:
+        """Rebuild the ID index after the columns have been filled."""
+        self._id_to_idx = {  # noqa: WPS601
+            r_id: idx for idx, r_id in enumerate(self.ids)
+        }
+
+    def get(self, recording_id: int, default=None) -> Optional[dict]:
+        """Return the row for recording_id as a dict (built on demand)."""
+        idx = self._id_to_idx.get(recording_id)
+        if idx is None:
+            return default
+        return {name: column[idx] for name, column in self.cols.items()}
+
+    def __len__(self) -> int:
+        """Number of recordings in the table."""
+        return len(self.ids)
+
+
+def read_recordings_columnar(
+    db_file: pathlib.Path,
+    conn: Optional[sqlite3.Connection] = None,
+) -> RecordingTable:
+    """Reads the Tablo DB and returns the Recording table by column."""
+    table = RecordingTable()
+    columns = [table.cols[name] for name in RECORDING_FIELDS]
+    with _cursor(db_file, conn) as cur:
+        cur.row_factory = None
+        for row in cur.execute(_SELECT_ALL_RECORDINGS):
+            for column, db_value in zip(columns, row):
+                column.append(db_value)
+
+    table.reindex()
+    return table
+
+
 @dataclass_json(letter_case=LetterCase.CAMEL)
 @dataclass(kw_only=True)
 class Recording(object):
@@ -201,13 +360,16 @@ class Recording(object):
         'seasonNumber': 'season_number',
         'originalAirDate': 'orig_air_date',
     }
+    # (source name, member name) pairs, unpacked once for the update loops
+    _channel_updates = tuple(channel_keymap.items())
+    _json_updates = tuple(json_keymap.items())
 
     @classmethod
     def fromdict(cls, recording_dict):
         """Construct and initialize a Recording object from a db row."""
         kwargs = {}
         for oldk, newk in cls.recording_keymap.items():
-            db_value = recording_dict.get(oldk)
+            db_value = recording_dict[oldk]
             if db_value:
                 kwargs[newk] = db_value
         return cls(**kwargs)
@@ -215,137 +377,213 @@ class Recording(object):
     def update_item_from_channel(
         self,
         channel_name: str,
-        channel_data: dict,
+        channel_data: sqlite3.Row,
         overwrite: bool = True,
     ):
         """Update specific member using information from Channel table."""
-        ch_value = channel_data.get(channel_name)
+        ch_value = channel_data[channel_name]
         member_name = self.channel_keymap.get(channel_name)
-        if ch_value and (overwrite or not self.__getattribute__(member_name)):
-            self.__setattr__(member_name, ch_value)
+        if ch_value and (overwrite or not getattr(self, member_name)):
+            setattr(self, member_name, ch_value)
 
-    def update_channel_info(self, channels: list[dict], overwrite: bool = True):
+    def update_channel_info(
+        self,
+        channels_by_id: dict[int, sqlite3.Row],
+        overwrite: bool = True,
+    ):
         """Update channel information using entry in Channel table."""
-        channel_data = [
-            chan for chan in channels if chan.get(ID) == self.channel_id
-        ]
-        if channel_data:
-            self.update_item_from_channel(
-                'callSign',
-                channel_data[0],
-                overwrite=overwrite,
-            )
-            self.update_item_from_channel(
-                'channelNumberMajor',
-                channel_data[0],
-                overwrite=overwrite,
-            )
-            self.update_item_from_channel(
-                'channelNumberMinor',
-                channel_data[0],
-                overwrite=overwrite,
-            )
-            self.update_item_from_channel(
-                'resolutionTitle',
-                channel_data[0],
-                overwrite=overwrite,
-            )
+        channel_data = channels_by_id.get(self.channel_id)
+        if not channel_data:
+            return
+        for channel_name, member_name in self._channel_updates:
+            ch_value = channel_data[channel_name]
+            if ch_value and (overwrite or not getattr(self, member_name)):
+                setattr(self, member_name, ch_value)
 
     def update_item_from_json(self, json_name: str, overwrite: bool = True):
         """Update a specific member using information from self.json."""
         json_value = self.json_data.get(json_name)
         member_name = self.json_keymap.get(json_name)
-        if json_value and (overwrite or not self.__getattribute__(member_name)):
-            self.__setattr__(member_name, json_value)
+        if json_value and (overwrite or not getattr(self, member_name)):
+            setattr(self, member_name, json_value)
 
     def update_from_json(self, overwrite: bool = True):
         """Update members from self.json."""
-        self.update_item_from_json('originalAirDate', overwrite=overwrite)
-        self.update_item_from_json('description', overwrite=overwrite)
-        self.update_item_from_json('episodeNumber', overwrite=overwrite)
-        self.update_item_from_json('seasonNumber', overwrite=overwrite)
-
-
-def list_tables(db_file: pathlib.Path) -> list[str]:
+        json_data = self.json_data
+        for json_name, member_name in self._json_updates:
+            json_value = json_data.get(json_name)
+            if json_value and (overwrite or not getattr(self, member_name)):
+                setattr(self, member_name, json_value)
+
+
+_ROW_KEYS = {
+    attr: col
+    for keymap in (Recording.recording_keymap, Recording.channel_keymap)
+    for col, attr in keymap.items()
+}
+
+
+def recording_getter(
+    recording: 'Recording | sqlite3.Row | Mapping[str, Any]',
+) -> Callable[[str], Any]:
+    """Return a reader of Recording fields for a Recording or a raw row."""
+    if isinstance(recording, Recording):
+        return partial(getattr, recording)
+    if isinstance(recording, sqlite3.Row):
+        recording = dict(recording)  # sqlite3.Row has no .get()
+    return lambda attr: recording.get(_ROW_KEYS[attr])
+
+
+def list_tables(
+    db_file: pathlib.Path,
+    conn: Optional[sqlite3.Connection] = None,
+) -> list[str]:
     """Reads the Tablo DB and returns a list of tables."""
     query = "SELECT name FROM sqlite_master WHERE type='table';"
-    with closing(sqlite3.connect(database=make_uri(db_file), uri=True)) as conn:
-        with conn:  # as transaction
-            conn.text_factory = str
-            with closing(conn.cursor()) as cur:
-                tables = cur.execute(query).fetchall()
-                table_names = sorted(list(zip(*tables))[0])
+    with _cursor(db_file, conn) as cur:
+        cur.row_factory = None
+        tables = cur.execute(query).fetchall()
+        table_names = sorted(list(zip(*tables))[0])
 
     return table_names
 
 
-def dump_schema(db_file: pathlib.Path, table_name: str) -> list[str]:
+def dump_schema(
+    db_file: pathlib.Path,
+    table_name: str,
+    conn: Optional[sqlite3.Connection] = None,
+) -> list[str]:
     """Reads the Tablo DB and returns the schema for a table."""
     query = f"PRAGMA table_info('{table_name}')"
-    with closing(sqlite3.connect(database=make_uri(db_file), uri=True)) as conn:
-        with conn:  # as transaction
-            conn.text_factory = str
-            with closing(conn.cursor()) as cur:
-                columns = cur.execute(query).fetchall()
-                column_names = list(zip(*columns))[1]
+    with _cursor(db_file, conn) as cur:
+        cur.row_factory = None
+        columns = cur.execute(query).fetchall()
+        column_names = list(zip(*columns))[1]
 
     return column_names
 
 
+def index_by_id(rows: Iterable[sqlite3.Row]) -> dict[int, sqlite3.Row]:
+    """Index rows read from the Tablo DB by their ID column."""
+    return {row[ID]: row for row in rows}
+
+
 def get_recording_info(
-    recording_data: list[dict],
-    channel_data: list[dict],
+    recordings_by_id: 'RecordingTable | dict[int, sqlite3.Row]',
+    channels_by_id: dict[int, sqlite3.Row],
     recording_id: int,
 ) -> 'Recording':
     """Retrieve metadata for a recording from the Tablo db."""
-    selected_data = [
-        rec for rec in recording_data if rec.get(ID) == recording_id
-    ]
-    if selected_data:
-        if len(selected_data) == 1:
-            recording_result = Recording.fromdict({**selected_data[0]})
-            recording_result.update_channel_info(channel_data, overwrite=False)
-            recording_result.update_from_json(overwrite=False)
-        else:
-            logger.error(f'Multiple entries found for recording {recording_id}')
-            for duplicate in selected_data:
-                logger.debug(json.dumps({**duplicate}, indent=4))
-            return None
-    else:
+    selected_data = recordings_by_id.get(recording_id)
+    if not selected_data:
         logger.error(f'No data found for recording {recording_id}')
         return None
 
-    logger.debug(json.dumps(asdict(recording_result)))
+    recording_result = Recording.fromdict(selected_data)
+    recording_result.update_channel_info(channels_by_id, overwrite=False)
+    recording_result.update_from_json(overwrite=False)
+    # serialized only if DEBUG is enabled; this runs once per recording
+    logger.opt(lazy=True).debug(
+        '{0}',
+        lambda: json.dumps(asdict(recording_result)),
+    )
     return recording_result
 
 
-def get_single_recording_info(db_file: pathlib.Path, r_id: int) -> 'Recording':
-    """Retrieve metadata for a recording from the Tablo db."""
-    recording_data = read_one_recording(db_file, r_id)
-    if not recording_data:
+def get_single_recording_info(
+    db_file: pathlib.Path,
+    r_id: int,
+    conn: Optional[sqlite3.Connection] = None,
+    *,
+    channel_data: Optional[Mapping[int, sqlite3.Row]] = None,
+    recording_data: Optional[Mapping[int, sqlite3.Row]] = None,
+) -> 'Recording':
+    """
+    Retrieve metadata for a recording from the Tablo db.
+
+    Rows already read by the caller can be supplied, by ID, through
+    recording_data and channel_data; otherwise they are queried.
+    """
+    if recording_data is None:
+        recording_row = read_one_recording(db_file, r_id, conn)
+    else:
+        recording_row = recording_data.get(r_id)
+    if not recording_row:
         logger.error(f'No data found for recording {r_id}')
         return None
 
-    recording_result = Recording.fromdict({**recording_data})
-    channel_data = read_one_channel(db_file, recording_result.channel_id)
-    if not channel_data:
-        logger.error(
-            'No channel information found for ' +
-            f'channel_id={recording_result.channel_id}',
-        )
+    recording_result = Recording.fromdict(recording_row)
+    chan_id = recording_result.channel_id
+    if channel_data is None:
+        channel_row = read_one_channel(db_file, chan_id, conn)
+    else:
+        channel_row = channel_data.get(chan_id)
+    if not channel_row:
+        logger.error(f'No channel information found for channel_id={chan_id}')
         return None
 
-    recording_result.update_channel_info([channel_data], overwrite=False)
+    recording_result.update_channel_info(
+        {chan_id: channel_row},
+        overwrite=False,
+    )
     recording_result.update_from_json(overwrite=False)
-    logger.debug(json.dumps(asdict(recording_result)))
+    # serialized only if DEBUG is enabled; this runs once per recording
+    logger.opt(lazy=True).debug(
+        '{0}',
+        lambda: json.dumps(asdict(recording_result)),
+    )
     return recording_result
 
 
+def iter_some_recordings_info(
+    db_file: pathlib.Path,
+    r_ids: Sequence[int],
+    conn: Optional[sqlite3.Connection] = None,
+) -> Iterator[Optional['Recording']]:
+    """
+    Yield the metadata for each of r_ids from the Tablo db, in order.
+
+    The rows are read in one batch when iteration starts; each Recording
+    (or None, if it can't be found) is built only when it is reached, so
+    errors about it are logged at that point.
+    """
+    recordings_by_id = read_some_recordings(db_file, r_ids, conn)
+    channels_by_id = read_some_channels(
+        db_file,
+        (row['channelID'] for row in recordings_by_id.values()),
+        conn,
+    )
+    for r_id in r_ids:
+        yield get_single_recording_info(
+            db_file,
+            r_id,
+            conn,
+            channel_data=channels_by_id,
+            recording_data=recordings_by_id,
+        )
+
+
+def get_some_recordings_info(
+    db_file: pathlib.Path,
+    r_ids: Sequence[int],
+    conn: Optional[sqlite3.Connection] = None,
+) -> dict[int, 'Recording']:
+    """Retrieve metadata for several recordings from the Tablo db at once."""
+    return {
+        r_id: recording_result
+        for r_id, recording_result in zip(
+            r_ids,
+            iter_some_recordings_info(db_file, r_ids, conn),
+        )
+        if recording_result
+    }
+
+
 if __name__ == '__main__':
     TEST_RECORDING_ID = 2494457
     tablo_db = pathlib.Path.home().joinpath('Tablo.db')
-    recording_data = read_recordings(tablo_db)
-    channel_data = read_channels(tablo_db)
+    recording_data = read_recordings_columnar(tablo_db)
+    channel_data = index_by_id(iter_channels(tablo_db))
     r_info = get_recording_info(recording_data, channel_data, TEST_RECORDING_ID)
     str_json = r_info.to_json()
     r_info2 = Recording.from_json(str_json)
@@ -0,0 +1,43 @@
+"""
+Module for running ffprobe against video files.
+
+This module implements the ffprobe wrapper shared by the merge and
+metadata modules. Results are cached per file path and modification
+time, so probing an unchanged file again is a dict lookup.
+"""
+import subprocess  # noqa: S404
+from functools import lru_cache
+
+try:
+    import orjson as _json_fast  # noqa: WPS433
+except ImportError:
+    import json as _json_fast  # noqa: WPS433, WPS440
+
+# cached probe results; enough for the segments of several recordings
+FFPROBE_CACHE_SIZE = 4096
+
+
+@lru_cache(maxsize=FFPROBE_CACHE_SIZE)
+def ffprobe_format(path_str: str, mtime: int) -> dict:
+    """
+    Returns ffprobe format and stream information for a file, as a dict.
+
+    mtime is only used as part of the cache key, so that a changed file
+    is probed again. The returned dict is shared, don't modify it.
+    """
+    command = [
+        'ffprobe',
+        '-loglevel',
+        'quiet',
+        '-print_format',
+        'json',
+        '-show_format',
+        '-show_streams',
+        path_str,
+    ]
+    completed = subprocess.run(  # noqa: S603
+        command,
+        capture_output=True,
+        check=True,
+    )
+    return _json_fast.loads(completed.stdout)
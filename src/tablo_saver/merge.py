@@ -9,17 +9,18 @@ with their contents. Implementation derived from:
 - https://github.com/ken-clifton/tablo_videos_from_harddrive/tree/main
 - https://community.tablotv.com/t/extracting-videos-from-tablo-external-hard-drive/25737/2  # noqa: E501
 """
-import json
 import os
 import pathlib
 import subprocess  # noqa: S404
-import tempfile
-from typing import Literal
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import suppress
+from typing import Iterable, Iterator, Literal, Optional, TextIO
 
 from loguru import logger
+from tablo_saver.ffprobe import ffprobe_format
 
 
-def probe(video_file_path: pathlib.Path) -> 'json':
+def probe(video_file_path: pathlib.Path) -> dict:
     """
     Returns ffprobe results in JSON format.
 
@@ -28,29 +29,10 @@ def probe(video_file_path: pathlib.Path) -> 'json':
     if not video_file_path or not video_file_path.exists():
         raise TypeError('Give ffprobe a full file path of the video')
 
-    command = [
-        'ffprobe',
-        '-loglevel',
-        'quiet',
-        '-print_format',
-        'json',
-        '-show_format',
-        '-show_streams',
-        video_file_path,
-    ]
-
-    pipe = subprocess.Popen(  # noqa: S603
-        command,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.STDOUT,
+    return ffprobe_format(
+        str(video_file_path),
+        video_file_path.stat().st_mtime_ns,
     )
-    out, err = pipe.communicate()
-    pipe.stdout.close()
-    return_code = pipe.wait()
-    if return_code:
-        raise subprocess.CalledProcessError(return_code, command)
-
-    return json.loads(out)
 
 
 DURATION: Literal['duration'] = 'duration'
@@ -75,105 +57,353 @@ def get_duration(video_file_path) -> float:
     raise ValueError(f'I found no {DURATION}')
 
 
-def prepare_segment_list(  # noqa: WPS210
-    recording_path: pathlib.Path,
-) -> pathlib.Path:
+TS_PACKET_SIZE = 188
+TS_SYNC_BYTE = 0x47
+PCR_CLOCK_HZ = 90000
+_PCR_BITS = 33  # PCR base is a 33-bit counter
+_PCR_WRAP = 1 << _PCR_BITS
+# PCRs may be up to 100 ms apart (ISO/IEC 13818-1), so scan enough of the
+# head and tail to span that at the ATSC rate of 19.39 Mbps, plus a few
+# packets for finding packet sync in a buffer that starts mid-packet
+_PCR_MAX_INTERVAL_MS = 100
+_MAX_TS_BITRATE = 19392658
+_MAX_TS_BYTES_PER_MS = _MAX_TS_BITRATE // 8 // 1000
+_PCR_SCAN_SIZE = TS_PACKET_SIZE * (
+    _MAX_TS_BYTES_PER_MS * _PCR_MAX_INTERVAL_MS // TS_PACKET_SIZE + 4
+)
+# where the fields _packet_pcr needs sit in a TS packet header and its
+# adaptation field, and the flags that say they are present
+_SYNC_RUN = 3  # consecutive sync bytes needed to trust packet alignment
+_PID_FIELD = slice(1, 3)
+_PID_MASK = 0x1FFF
+_ADAPTATION_CONTROL_OFFSET = 3
+_ADAPTATION_FIELD_FLAG = 0x20
+_ADAPTATION_LENGTH_OFFSET = 4
+_PCR_MIN_ADAPTATION_LENGTH = 7  # the flags byte, then the 6-byte PCR
+_ADAPTATION_FLAGS_OFFSET = 5
+_PCR_FLAG = 0x10
+_PCR_OFFSET = 6
+_PCR_BASE_FIELD = slice(_PCR_OFFSET, _PCR_OFFSET + 5)
+_PCR_BASE_SHIFT = 7  # bits after the 33-bit base in those five bytes
+
+
+def _find_sync(buffer: bytes) -> Optional[int]:
+    """Find the offset of the first whole TS packet in buffer, if any."""
+    # the buffer may start mid-packet; look for a run of sync bytes one
+    # packet apart
+    sync_run = bytes([TS_SYNC_BYTE]) * _SYNC_RUN
+    run_size = _SYNC_RUN * TS_PACKET_SIZE
+    for offset in range(TS_PACKET_SIZE):
+        if buffer[offset:offset + run_size:TS_PACKET_SIZE] == sync_run:
+            return offset
+    return None
+
+
+def _packet_pcr(pkt: bytes) -> Optional[tuple[int, int]]:
+    """Return (pid, pcr_base) if the TS packet pkt carries a PCR."""
+    # need sync byte, an adaptation field long enough for a PCR, and the
+    # PCR_flag set in that adaptation field
+    if pkt[0] != TS_SYNC_BYTE:
+        return None
+    if not pkt[_ADAPTATION_CONTROL_OFFSET] & _ADAPTATION_FIELD_FLAG:
+        return None
+    if pkt[_ADAPTATION_LENGTH_OFFSET] < _PCR_MIN_ADAPTATION_LENGTH:
+        return None
+    if not pkt[_ADAPTATION_FLAGS_OFFSET] & _PCR_FLAG:
+        return None
+    pid = int.from_bytes(pkt[_PID_FIELD], 'big') & _PID_MASK
+    return pid, int.from_bytes(pkt[_PCR_BASE_FIELD], 'big') >> _PCR_BASE_SHIFT
+
+
+def _iter_pcrs(buffer: bytes) -> Iterator[tuple[int, int]]:
+    """Yield (pid, pcr_base) for every PCR-bearing TS packet in buffer."""
+    start = _find_sync(buffer)
+    if start is None:
+        return
+    end = len(buffer) - TS_PACKET_SIZE + 1
+    for offset in range(start, end, TS_PACKET_SIZE):
+        pcr = _packet_pcr(buffer[offset:offset + TS_PACKET_SIZE])
+        if pcr is not None:
+            yield pcr
+
+
+def _ts_duration(ts_file: pathlib.Path) -> float:
     """
-    Process the .ts files in recording_path to produce control file.
+    Compute the duration of an MPEG-TS file from its PCR timestamps [seconds].
 
-    :returns: the name of the ffmpeg control file
+    Reads only the head and tail of the file, and measures the span between
+    the first and last PCR on the same PID, which avoids running ffprobe.
     """
-    logger.info('Starting processing of .ts files, this takes a while...')
-
-    # get list of files in directory
-    sorted_file_list = [
-        tsfile.name for tsfile in recording_path.iterdir() if tsfile.is_file()
-    ]
-    # sort the files ascending
-    sorted_file_list.sort()
-
-    # temporary text file for all pieces of video built below then
-    # used with ffmpeg
-    with tempfile.NamedTemporaryFile(mode='w', delete=False) as segment_list:
-        segment_list_name = pathlib.Path(segment_list.name)
-        # loop through the list of sorted .ts files for the recording adding
-        # them to the temp textfile
-        ts_count = 0
-        for filename in sorted_file_list:
-            # only add files with .ts extension
-            if (filename.endswith('.ts')):
-                # build full .ts file path
-                filename_and_path = recording_path.joinpath(filename)
-                # write concat text file line
-                segment_list.write(f"file '{filename_and_path}'\n")
-                # get .ts file duration, but must subtract 1/2 second so no
-                # skipping in video
-                duration = get_duration(filename_and_path) - 0.5
-                # write concat text file duration line
-                segment_list.write(f'duration {duration:.1f}\n')
-                ts_count = ts_count + 1
-                logger.info(f'Processed file: {filename}')
-        segment_list.close()
-
-    if ts_count == 0:
-        os.unlink(segment_list_name)
+    with open(ts_file, 'rb') as ts:
+        pcr_pid, first_pcr = next(
+            _iter_pcrs(ts.read(_PCR_SCAN_SIZE)),
+            (None, None),
+        )
+        if pcr_pid is None:
+            raise ValueError(f'No PCR found in {ts_file}')
+        size = ts.seek(0, os.SEEK_END)
+        ts.seek(max(size - _PCR_SCAN_SIZE, 0))
+        tail = ts.read()
+
+    tail_pcrs = [pcr for pid, pcr in _iter_pcrs(tail) if pid == pcr_pid]
+    if not tail_pcrs or tail_pcrs[-1] == first_pcr:
+        raise ValueError(f'Unable to measure PCR span of {ts_file}')
+    return ((tail_pcrs[-1] - first_pcr) % _PCR_WRAP) / PCR_CLOCK_HZ
+
+
+def _segment_duration(ts_file: pathlib.Path) -> Optional[float]:
+    """Retrieve the duration of a segment, or None if it can't be found."""
+    try:
+        return _ts_duration(ts_file)
+    except (OSError, ValueError) as exc:
+        logger.debug(f'Falling back to ffprobe: {exc}')
+    try:
+        return get_duration(ts_file)
+    except Exception as exc:
+        logger.warning(f'Unable to determine duration of {ts_file}: {exc}')
+        return None
+
+
+def _concat_entry(ts_file: pathlib.Path, duration: Optional[float]) -> str:
+    """Format the ffmpeg concat entry for ts_file."""
+    # ffmpeg resolves entries against the list's own URL, pipe:0, so give
+    # the file: protocol explicitly; a quote ends the quoted path, so close
+    # it, add an escaped quote and reopen it
+    quoted = str(ts_file).replace("'", r"'\''")
+    if duration is None:
+        return f"file 'file:{quoted}'\n"
+    # must subtract 1/2 second so no skipping in video
+    return f"file 'file:{quoted}'\nduration {duration - 0.5:.1f}\n"
+
+
+def count_ts_files(recording_path: 'str | os.PathLike[str]') -> int:
+    """Count the number of ts files in the specified directory."""
+    ts_count = 0
+    with os.scandir(recording_path) as entries:
+        for entry in entries:
+            # only count files with .ts extension; is_file() uses d_type
+            if entry.name.endswith('.ts') and entry.is_file():
+                ts_count += 1
+    return ts_count
+
+
+def ts_count_or_none(
+    recording_path: 'str | os.PathLike[str]',
+) -> Optional[int]:
+    """Count the ts files in recording_path, or None if it does not exist."""
+    try:
+        return count_ts_files(recording_path)
+    except FileNotFoundError:
+        return None
+
+
+def find_segments(recording_path: pathlib.Path) -> list[pathlib.Path]:
+    """Find the .ts segments of a recording, in playback order."""
+    # .ts files in the directory, sorted ascending by name, as absolute
+    # paths (ffmpeg reads the control file from a pipe, so it has no
+    # directory to resolve relative paths from)
+    ts_files = sorted(
+        (
+            tsfile for tsfile in recording_path.absolute().iterdir()
+            if tsfile.suffix == '.ts' and tsfile.is_file()
+        ),
+        key=lambda tsfile: tsfile.name,
+    )
+    if not ts_files:
         raise ValueError(f'No ts segments found in {recording_path}')
+    return ts_files
+
+
+def prepare_segment_list(ts_files: list[pathlib.Path]) -> Iterator[str]:
+    """
+    Process the .ts files in ts_files to produce control file.
+
+    :returns: the ffmpeg control file, one (possibly multi-line) entry
+        per segment, produced lazily as each segment is probed
+    """
+    logger.info('Starting processing of .ts files...')
+    # each probe is independent, so run them concurrently; map() yields
+    # the results in segment order as soon as each one is available
+    executor = ThreadPoolExecutor(max_workers=os.cpu_count() or 4)
+    durations = executor.map(_segment_duration, ts_files)
+    try:  # noqa: WPS501
+        for ts_file, duration in zip(ts_files, durations):
+            yield _concat_entry(ts_file, duration)
+            logger.info(f'Processed file: {ts_file.name}')
+    finally:
+        # don't keep probing if the consumer (ffmpeg) has gone away
+        executor.shutdown(cancel_futures=True)
 
     logger.info('Processing of .ts files completed successfully.')
-    return segment_list_name
 
 
-def execute(cmd: list[str]):
-    """Execute a command but present output as it occurs."""
+# CreateProcess caps the whole command line at 32767 characters, so leave
+# room for the rest of the ffmpeg command; Linux caps each argument at
+# MAX_ARG_STRLEN (128 KiB)
+_NT_MAX_CONCAT_ARG = 30000
+_POSIX_MAX_CONCAT_ARG = 131000
+_MAX_CONCAT_ARG = (
+    _NT_MAX_CONCAT_ARG if os.name == 'nt' else _POSIX_MAX_CONCAT_ARG
+)
+
+
+def _stream_signature(ts_file: pathlib.Path) -> tuple:
+    """Summarize the codec parameters of each stream in ts_file."""
+    return tuple(
+        (
+            stream.get('codec_type'),
+            stream.get('codec_name'),
+            stream.get('profile'),
+            stream.get('width'),
+            stream.get('height'),
+            stream.get('sample_rate'),
+            stream.get('channels'),
+        )
+        for stream in probe(ts_file).get('streams', ())
+    )
+
+
+def _segments_match(ts_files: list[pathlib.Path]) -> bool:
+    """Check that sampled segments of a recording share codec parameters."""
+    # a recording comes from one tuner on one channel, so the segments only
+    # differ if the broadcast itself changed format; sampling the start,
+    # middle and end catches that without probing every segment
+    middle = len(ts_files) // 2
+    sample = {ts_files[0], ts_files[middle], ts_files[-1]}
+    try:
+        signatures = {_stream_signature(ts_file) for ts_file in sample}
+    except Exception as exc:
+        logger.debug(f'Unable to compare segment codecs: {exc}')
+        return False
+    return len(signatures) == 1 and all(signatures)
+
+
+def _concat_input(ts_files: list[pathlib.Path]) -> Optional[str]:
+    """Build the ffmpeg concat: protocol input for ts_files, if possible."""
+    paths = [str(ts_file) for ts_file in ts_files]
+    concat_arg = f"concat:{'|'.join(paths)}"
+    if len(concat_arg) > _MAX_CONCAT_ARG:
+        return None
+    if any('|' in path for path in paths):
+        return None
+    if not _segments_match(ts_files):
+        return None
+    return concat_arg
+
+
+def _feed(stream: TextIO, lines: Iterable[str]) -> None:
+    """Write lines to stream (the stdin of a subprocess), then close it."""
+    # if the subprocess exits early, its return code tells why
+    with suppress(BrokenPipeError):
+        with stream:
+            stream.writelines(lines)
+
+
+def execute(cmd: list[str], feed: Optional[Iterable[str]] = None):
+    """
+    Execute a command but present output as it occurs.
+
+    If feed is given, its lines are written to the command's stdin from
+    a background thread while the output is being read.
+    """
     popen = subprocess.Popen(  # noqa: S603
         cmd,
+        stdin=None if feed is None else subprocess.PIPE,
         stdout=subprocess.PIPE,
         stderr=subprocess.STDOUT,
         universal_newlines=True,
+        bufsize=1,  # line-buffered, so each fed line is passed on at once
     )
-    yield from iter(popen.stdout.readline, '')
-    popen.stdout.close()
-    return_code = popen.wait()
+    with ThreadPoolExecutor(max_workers=1) as feeder:
+        if feed is not None:
+            fed = feeder.submit(_feed, popen.stdin, feed)
+        yield from iter(popen.stdout.readline, '')
+        popen.stdout.close()
+        return_code = popen.wait()
     if return_code:
         raise subprocess.CalledProcessError(return_code, cmd)
+    if feed is not None:
+        fed.result()  # re-raise anything that went wrong producing feed
 
 
-def do_merge(
-    segment_list: pathlib.Path,
+def _merge_command(
+    input_args: list[str],
     output_file: pathlib.Path,
-    overwrite: bool,
-) -> bool:
-    """Merge the ts segments in segment_list to the target output_file."""
-    command = [
+) -> list[str]:
+    """Build the ffmpeg command to stream-copy input_args to output_file."""
+    return [
         'ffmpeg',
-        '-f',
-        'concat',
-        '-safe',
-        '0',
-        '-i',
-        segment_list,
+        '-fflags',
+        '+genpts',
+        *input_args,
         '-c',
         'copy',
         '-bsf:a',
         'aac_adtstoasc',
+        '-avoid_negative_ts',
+        'make_zero',
+        '-threads',
+        '0',
         '-movflags',
         '+faststart',
         '-y',
         output_file,
     ]
 
+
+def _run_merge(
+    command: list[str],
+    output_file: pathlib.Path,
+    feed: Optional[Iterable[str]] = None,
+) -> bool:
+    """Run an ffmpeg merge command, logging its output."""
     # run ffmpeg command to make concatenated video
     logger.info('Starting ffmpeg processing, this can take several minutes...')
     logger.info(f'The output MP4 video file will be placed in: {output_file}')
 
-    for line in execute(command):
+    for line in execute(command, feed=feed):
         logger.debug(line, end='')
 
     logger.info('ffmpeg concatenation of files complete.')
-    segment_list.unlink()
     return True
 
 
+def do_merge(
+    segment_list: Iterable[str],
+    output_file: pathlib.Path,
+    overwrite: bool,
+) -> bool:
+    """Merge the ts segments in segment_list to the target output_file."""
+    # the concat demuxer reads the control file from ffmpeg's stdin, which
+    # is fed while the segments are still being probed
+    command = _merge_command(
+        [
+            '-f',
+            'concat',
+            '-safe',
+            '0',
+            '-protocol_whitelist',
+            'file,pipe',
+            '-i',
+            'pipe:0',
+        ],
+        output_file,
+    )
+    return _run_merge(command, output_file, feed=segment_list)
+
+
+def do_concat_merge(
+    concat_input: str,
+    output_file: pathlib.Path,
+    overwrite: bool,
+) -> bool:
+    """Merge ts segments joined by the concat: protocol to output_file."""
+    # MPEG-TS can simply be read back to back, so with matching codecs the
+    # concat protocol needs no control file and no per-segment durations
+    command = _merge_command(['-i', concat_input], output_file)
+    return _run_merge(command, output_file)
+
+
 def process(
     recording_path: pathlib.Path,
     outfile: pathlib.Path,
@@ -185,7 +415,17 @@ def process(
         return -2
 
     logger.success(f'   Processing {recording_path} -> {outfile}')
-    segment_list = prepare_segment_list(recording_path)
+    ts_files = find_segments(recording_path)
+    concat_input = _concat_input(ts_files)
+    if concat_input:
+        try:
+            merged = do_concat_merge(concat_input, outfile, overwrite)
+        except subprocess.CalledProcessError as exc:
+            logger.warning(f'concat: merge failed ({exc}), retrying with list')
+        else:
+            return 0 if merged else -1
+
+    segment_list = prepare_segment_list(ts_files)
     return 0 if do_merge(segment_list, outfile, overwrite) else -1
 
 
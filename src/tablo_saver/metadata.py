@@ -5,14 +5,17 @@ This module implements functions necessary to read/write/update
 metadata within an mp4 file.
 """
 import json
+import operator
 import pathlib
 import subprocess  # noqa: S404
 from dataclasses import asdict
-from typing import List, Literal
+from types import MappingProxyType
+from typing import Callable, List, Literal, Mapping
 
 import tablo_saver
 from loguru import logger
 from tablo_saver.db import Recording
+from tablo_saver.ffprobe import ffprobe_format
 
 TITLE: Literal['title'] = 'title'
 
@@ -26,29 +29,10 @@ def get_current_tags(video_file_path: pathlib.Path) -> dict:
     if not video_file_path or not video_file_path.exists():
         raise TypeError('Give ffprobe a full file path of the video')
 
-    command = [
-        'ffprobe',
-        '-loglevel',
-        'quiet',
-        '-print_format',
-        'json',
-        '-show_format',
-        '-show_streams',
-        video_file_path,
-    ]
-
-    pipe = subprocess.Popen(  # noqa: S603
-        command,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.STDOUT,
+    json_results = ffprobe_format(
+        str(video_file_path),
+        video_file_path.stat().st_mtime_ns,
     )
-    out, err = pipe.communicate()
-    pipe.stdout.close()
-    return_code = pipe.wait()
-    if return_code:
-        raise subprocess.CalledProcessError(return_code, command)
-
-    json_results = json.loads(out)
     return json_results.get('format').get('tags')
 
 
@@ -76,29 +60,43 @@ mmap_movie = {
     '-sortname': TITLE,                 # sonm
 }
 
+MetadataGetter = tuple[str, Callable[['Recording'], object]]
+MetadataGetters = tuple[MetadataGetter, ...]
+
+
+def metadata_getters(mmap: Mapping[str, str]) -> MetadataGetters:
+    """Pair each mp4tags option in mmap with a getter for its attribute."""
+    return tuple(
+        (cmd, operator.attrgetter(key)) for cmd, key in mmap.items()
+    )
+
+
+_MMAP_TV = metadata_getters(mmap_tv)
+_MMAP_MOVIE = metadata_getters(mmap_movie)
+
+
+MEDIA_TYPES = MappingProxyType({
+    'Episode': 'tvshow',
+    'Show': 'tvshow',
+})
+RESOLUTION_CODES = MappingProxyType({
+    '480i': 0,
+    '720p': 1,
+    '1080i': 2,
+    '1080p': 2,
+    '2160i': 3,
+    '2160p': 3,
+})
+
 
 def compute_media_type(recording_info: 'Recording') -> str:
     """Episode or Show -> tvshow. Movie -> movie."""
-    et = recording_info.entity_type
-    if et == 'Episode':
-        return 'tvshow'
-    if et == 'Show':
-        return 'tvshow'
-    return 'Movie'
+    return MEDIA_TYPES.get(recording_info.entity_type, 'Movie')
 
 
 def compute_resolution_code(recording_info: 'Recording') -> int:
     """Generate the correct hdvd code (0=SD,1=720,2=1080,3=2160)."""
-    res = recording_info.resolution_title
-    if res == '480i':
-        return 0
-    if res == '720p':
-        return 1
-    if res in {'1080i', '1080p'}:
-        return 2
-    if res in {'2160i', '2160p'}:
-        return 3
-    return -1
+    return RESOLUTION_CODES.get(recording_info.resolution_title, -1)
 
 
 def compute_sorted_epname(recording_info: 'Recording') -> str:
@@ -118,51 +116,62 @@ def process_cast_list(cast: str) -> List[List[str]]:
         tmp_cast = json.loads(cast)
     except Exception as exc:
         logger.error(f'Error occurred processing cast list: {exc}')
+        return cast_result
 
     for artist in tmp_cast:
         artist_names = artist.split()
-        cast_result.append(artist_names)
+        if artist_names:
+            cast_result.append(artist_names)
     return cast_result
 
 
-def compute_artist(
-    recording_info: 'Recording',
-    for_sorting: bool,
-) -> List[List[str]]:
-    """Use recording_info to generate artist (cast) value."""
+def compute_artist_both(recording_info: 'Recording') -> tuple[str, str]:
+    """Use recording_info to generate artist (cast) and sort-artist values."""
     if recording_info.top_cast:
         cast_data = process_cast_list(recording_info.top_cast)
     elif recording_info.full_cast:
         cast_data = process_cast_list(recording_info.full_cast)
     else:
-        return ''
+        return '', ''
 
     cast_names = []
+    sort_names = []
     for artist in cast_data:
-        if for_sorting:
-            if len(artist) > 1:
-                last = artist[-1]
-                rest = ' '.join(artist[:-1])
-                artist_name = f'{last}, {rest}'
-            else:
-                artist_name = artist[0]
+        cast_names.append(' '.join(artist))
+        if len(artist) > 1:
+            last = artist[-1]
+            rest = ' '.join(artist[:-1])
+            sort_names.append(f'{last}, {rest}')
         else:
-            artist_name = ' '.join(artist)
-        cast_names.append(artist_name)
+            sort_names.append(artist[0])
 
-    return '; '.join(cast_names)
+    return '; '.join(cast_names), '; '.join(sort_names)
+
+
+def compute_artist(recording_info: 'Recording', for_sorting: bool) -> str:
+    """Use recording_info to generate artist (cast) value."""
+    cast, sort_cast = compute_artist_both(recording_info)
+    return sort_cast if for_sorting else cast
 
 
 def compute_metadata_from_map(
     recording_info: 'Recording',
-    mmap: dict,
+    mmap: 'Mapping[str, str] | MetadataGetters',
 ) -> list[str]:
-    """Process the data in recording_info, as specified in mmap."""
+    """
+    Process the data in recording_info, as specified in mmap.
+
+    mmap is either a map of mp4tags options to Recording attributes, like
+    mmap_tv, or the (option, getter) pairs metadata_getters makes of one.
+    """
+    if isinstance(mmap, Mapping):
+        mmap = metadata_getters(mmap)
     args = []
-    for cmd, key in mmap.items():
-        rvalue = getattr(recording_info, key)
+    for cmd, getter in mmap:
+        rvalue = getter(recording_info)
         if rvalue:
-            args.extend([cmd, str(rvalue)])
+            args.append(cmd)
+            args.append(str(rvalue))
     return args
 
 
@@ -177,18 +186,17 @@ def prepare_metadata_args(recording_info: 'Recording') -> list[str]:
     if rescode >= 0:
         args.extend(['-hdvideo', str(rescode)])
 
-    cast = compute_artist(recording_info, for_sorting=False)
+    cast, sort_cast = compute_artist_both(recording_info)
     if cast:
         args.extend(['-artist', cast])
-    cast = compute_artist(recording_info, for_sorting=True)
-    if cast:
-        args.extend(['-sortartist', cast])
+    if sort_cast:
+        args.extend(['-sortartist', sort_cast])
 
     if media_type == 'tvshow':
-        args.extend(compute_metadata_from_map(recording_info, mmap_tv))
+        args.extend(compute_metadata_from_map(recording_info, _MMAP_TV))
         args.extend(['-sortname', compute_sorted_epname(recording_info)])
     else:
-        args.extend(compute_metadata_from_map(recording_info, mmap_movie))
+        args.extend(compute_metadata_from_map(recording_info, _MMAP_MOVIE))
     return args
 
 
@@ -230,8 +238,10 @@ if __name__ == '__main__':
     ).with_suffix('.mp4')
 
     table_db = pathlib.Path.home().joinpath('Tablo.db')
-    recording_data = tablo_saver.db.read_recordings(table_db)
-    channel_data = tablo_saver.db.read_channels(table_db)
+    recording_data = tablo_saver.db.read_recordings_columnar(table_db)
+    channel_data = tablo_saver.db.index_by_id(
+        tablo_saver.db.iter_channels(table_db),
+    )
 
     rinfo = tablo_saver.db.get_recording_info(
         recording_data,
@@ -9,79 +9,72 @@ there are .ts files which correspond to it (this case would represent
 an unrecoverable recording).
 """
 import pathlib
+import sqlite3
+from functools import partial
+from typing import Any, Callable, Mapping
 
 import tablo_saver
 from loguru import logger
-from tablo_saver.db import Recording
+from tablo_saver.db import Recording, recording_getter
+from tablo_saver.merge import ts_count_or_none
 
 
-def count_ts_files(recording_path: pathlib.Path) -> int:
-    """Count the number of ts files in the specified directory."""
-    sorted_file_list = [
-        tsfile.name for tsfile in recording_path.iterdir() if tsfile.is_file()
-    ]
-    # sort the files ascending
-    sorted_file_list.sort()
-    ts_count = 0
-    for filename in sorted_file_list:
-        # only count files with .ts extension
-        if (filename.endswith('.ts')):
-            ts_count = ts_count + 1
-    return ts_count
+def _format_logstr(r_id: int, get: Callable[[str], Any]) -> str:
+    """Generate an id string from the Recording fields returned by get."""
+    ttl = get('title')
+    ettl = get('episode_title')
+    evar = get('entity_type')
+    svar = get('sub_type')
+    enum = get('episode_number')
+    snum = get('season_number')
+    names = f'"{ttl}"/"{ettl}"'
+    kinds = f'{evar}/{svar} s{enum}e{snum}'
+    return f'{r_id} = {names} : {kinds}'
 
 
 def make_logstr_rinfo(r_id: int, rinfo: 'Recording') -> str:
     """Generate an id string for use in log messages, given a Recording."""
-    ttl = rinfo.title
-    ettl = rinfo.episode_title
-    logstr1 = f'{r_id} = "{ttl}"/"{ettl}"'
+    return _format_logstr(r_id, recording_getter(rinfo))
 
-    evar = rinfo.entity_type
-    svar = rinfo.sub_type
-    logstr2 = f'{evar}/{svar}'
 
-    evar = rinfo.episode_number
-    svar = rinfo.season_number
-    logstr3 = f's{evar}e{svar}'
+def make_logstr_rdict(
+    r_id: int,
+    rd: 'sqlite3.Row | Mapping[str, Any]',
+) -> str:
+    """Generate an id string for use in log messages, given a raw row."""
+    return _format_logstr(r_id, recording_getter(rd))
 
-    return f'{logstr1} : {logstr2} {logstr3}'
 
-
-def make_logstr_rdict(r_id: int, rd: dict) -> str:
-    """Generate an id string for use in log messages, given a dict."""
-    ttl = rd.get('title')
-    ettl = rd.get('episodeTitle')
-    logstr1 = f'{r_id} = "{ttl}"/"{ettl}"'
-
-    evar = rd.get('entityType')
-    svar = rd.get('subType')
-    logstr2 = f'{evar}/{svar}'
-
-    evar = rd.get('episodeNum')
-    svar = rd.get('seasonNum')
-    logstr3 = f's{evar}e{svar}'
-
-    return f'{logstr1} : {logstr2} {logstr3}'
+def make_report_rinfo(r_id: int, rinfo: 'Recording', tsnum: int) -> str:
+    """Generate the multi-line report entry for a Recording."""
+    logstr = make_logstr_rinfo(r_id, rinfo)
+    return (
+        f'{logstr} ({tsnum})\n' +
+        f'    top cast = {rinfo.top_cast}\n' +
+        f'    full cast = {rinfo.full_cast}\n' +
+        f'    res = {rinfo.resolution_title}'
+    )
 
 
 def report_all(db_file: pathlib.Path, tablo_mount_path: pathlib.Path) -> None:
     """Report information about all recordings in Tablo db."""
-    recording_data = tablo_saver.db.read_recordings(db_file)
-    channel_data = tablo_saver.db.read_channels(db_file)
-    for rd in recording_data:
-        r_id = rd.get('ID')
+    recordings = tablo_saver.db.read_recordings_columnar(db_file)
+    channels_by_id = tablo_saver.db.index_by_id(
+        tablo_saver.db.iter_channels(db_file),
+    )
+    for r_id in recordings.ids:
         # make the full recording path by adding /rec , /recording_id, "/segs"
         recording_path = tablo_mount_path.joinpath('rec', str(r_id), 'segs')
         try:
             rinfo = tablo_saver.db.get_recording_info(
-                recording_data,
-                channel_data,
+                recordings,
+                channels_by_id,
                 r_id,
             )
         except Exception as exc:
-            logstr = make_logstr_rdict(r_id, rd)
-            if recording_path.exists():
-                tsnum = count_ts_files(recording_path)
+            logstr = make_logstr_rdict(r_id, recordings.get(r_id))
+            tsnum = ts_count_or_none(recording_path)
+            if tsnum is not None:
                 logger.error(f'Got an exception for {logstr} ({tsnum}) {exc}')
             else:
                 logger.warning(
@@ -89,15 +82,15 @@ def report_all(db_file: pathlib.Path, tablo_mount_path: pathlib.Path) -> None:
                 )
             continue
 
-        logstr = make_logstr_rinfo(r_id, rinfo)
-        if recording_path.exists():
-            tsnum = count_ts_files(recording_path)
-            logger.info(f'{logstr} ({tsnum})')
-            logger.info(f'    top cast = {rinfo.top_cast}')
-            logger.info(f'    full cast = {rinfo.full_cast}')
-            logger.info(f'    res = {rinfo.resolution_title}')
+        tsnum = ts_count_or_none(recording_path)
+        if tsnum is not None:
+            # one record per recording, only formatted if INFO is enabled
+            logger.opt(lazy=True).info(
+                '{0}',
+                partial(make_report_rinfo, r_id, rinfo, tsnum),
+            )
         else:
-            logger.warning(f'No segment dir: {logstr}')
+            logger.warning(f'No segment dir: {make_logstr_rinfo(r_id, rinfo)}')
 
 
 if __name__ == '__main__':
@@ -7,24 +7,74 @@ a list of recordings, or entire contents.
 import argparse
 import importlib.metadata
 import json
+import os
 import pathlib
 import re
+import sqlite3
 import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import asdict
-from typing import Optional
+from functools import cache, lru_cache, partial
+from typing import (
+    Any,
+    Callable,
+    Iterable,
+    Iterator,
+    Mapping,
+    NamedTuple,
+    Optional,
+)
 
 from loguru import logger
 from tablo_saver.db import (
     Recording,
+    RecordingTable,
     get_recording_info,
-    get_single_recording_info,
-    read_channels,
-    read_recordings,
+    index_by_id,
+    iter_channels,
+    iter_some_recordings_info,
+    read_recordings_columnar,
+    recording_getter,
 )
-from tablo_saver.merge import process
+from tablo_saver.merge import process, ts_count_or_none
 from tablo_saver.metadata import update_metadata
 
 
+@cache
+def _version() -> str:
+    """Return the installed tablo_saver version (looked up once)."""
+    return importlib.metadata.version('tablo_saver')
+
+
+class _VersionAction(argparse.Action):
+    """Like action='version', but only looks the version up when used."""
+
+    def __init__(self, option_strings, dest=argparse.SUPPRESS, **kwargs):
+        kwargs.setdefault('help', "show program's version number and exit")
+        super().__init__(
+            option_strings=option_strings,
+            dest=dest,
+            default=argparse.SUPPRESS,
+            nargs=0,
+            **kwargs,
+        )
+
+    def __call__(self, parser, namespace, values, option_string=None):
+        print(f'{parser.prog} {_version()}')  # noqa: WPS421
+        parser.exit()
+
+
+def _positive_int(arg: str) -> int:
+    """Parse a command line argument that must be an integer >= 1."""
+    try:
+        number = int(arg)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f'invalid integer: {arg!r}')
+    if number < 1:
+        raise argparse.ArgumentTypeError(f'must be at least 1, got {number}')
+    return number
+
+
 def _parse_cli(cli_args: list[str]) -> argparse.Namespace:  # noqa: WPS213
     parser = argparse.ArgumentParser(
         prog='tablo_rescue',
@@ -46,12 +96,10 @@ def _parse_cli(cli_args: list[str]) -> argparse.Namespace:  # noqa: WPS213
         action='store_true',
         help='show debug messages',
     )
-    version_str = importlib.metadata.version('tablo_saver')
     parser.add_argument(
         '-V',
         '--version',
-        action='version',
-        version=f'%(prog)s {version_str}',  # noqa: F821,WPS323
+        action=_VersionAction,
     )
     parser.add_argument(
         '-o',
@@ -69,6 +117,7 @@ def _parse_cli(cli_args: list[str]) -> argparse.Namespace:  # noqa: WPS213
         '-I',
         '--id',
         metavar='N',
+        type=int,
         nargs='+',
         help='only rescue (or inspect) the recording(s) with the ' +
         'specified id(s)',
@@ -79,6 +128,14 @@ def _parse_cli(cli_args: list[str]) -> argparse.Namespace:  # noqa: WPS213
         action='store_true',
         help='force overwrite any existing output file',
     )
+    parser.add_argument(
+        '-j',
+        '--jobs',
+        metavar='N',
+        type=_positive_int,
+        default=1,
+        help='rescue up to N recordings at once (default: 1)',
+    )
     parser.add_argument(
         '-D',
         '--dump',
@@ -105,61 +162,52 @@ def _parse_cli(cli_args: list[str]) -> argparse.Namespace:  # noqa: WPS213
     return args
 
 
-def count_ts_files(recording_path: pathlib.Path) -> int:
-    """Count the number of ts files in the specified directory."""
-    sorted_file_list = [
-        tsfile.name for tsfile in recording_path.iterdir() if tsfile.is_file()
-    ]
-    # sort the files ascending
-    sorted_file_list.sort()
-    ts_count = 0
-    for filename in sorted_file_list:
-        # only count files with .ts extension
-        if (filename.endswith('.ts')):
-            ts_count = ts_count + 1
-    return ts_count
-
-
-EXCLUDED_CHRS = set(r'<>:"/\|?*')  # Illegal characters in Windows filenames.
-EXCLUDED_CHRS.update(chr(127))     # noqa: WPS432 (DEL is unprintable)
-VALID_CHRS = frozenset(
-    chr(char)
-    for char in range(32, 255)  # noqa: WPS432
-    if chr(char) not in EXCLUDED_CHRS
+_RES_RE = re.compile(r'\d+')
+
+EXCLUDED_CHRS = frozenset(r'<>:"/\|?*')  # Illegal in Windows filenames.
+# ...plus control chars, DEL, and anything beyond latin-1
+_INVALID_RE = re.compile(
+    '[{0}\x00-\x1f\x7f\xff-\U0010ffff]'.format(  # noqa: WPS342
+        re.escape(''.join(sorted(EXCLUDED_CHRS))),
+    ),
 )
 
 
 def sanitize_filename(fn: str) -> str:
     """Replace illegal filename characters with _."""
-    return ''.join(char if char in VALID_CHRS else '_' for char in fn)
+    if _INVALID_RE.search(fn) is None:
+        return fn  # already clean; the common case
+    return _INVALID_RE.sub('_', fn)
+
+
+def _rip_tag(resolution_title: Optional[str]) -> str:
+    """Classify a resolution title (e.g. 1080i) as HDRip or TVRip."""
+    res = _RES_RE.match(resolution_title or '')
+    if res and int(res.group(0)) > 480:  # noqa: WPS432
+        return 'HDRip'
+    return 'TVRip'
+
+
+def _format_filename(r_id: int, get: Callable[[str], Any]) -> str:
+    """Generate a filename from the Recording fields returned by get."""
+    ttl = get('title')
+    evar = get('entity_type')
+    svar = get('sub_type')
+    rip = _rip_tag(get('resolution_title'))
+    tags = f'[{evar} {svar}] [{rip}]'
+    if evar == 'Episode':
+        ettl = get('episode_title')
+        ns3 = make_season_episode_str(
+            get('episode_number'),
+            get('season_number'),
+        )
+        return sanitize_filename(f'{r_id} {ttl} - {ns3} - {ettl} - {tags}')
+    return sanitize_filename(f'{r_id} {ttl} - {tags}')
 
 
 def make_filename_rinfo(r_id: int, rinfo: 'Recording') -> str:
     """Generate a filename for the specified Recording."""
-    ttl = rinfo.title
-    ettl = rinfo.episode_title
-    ns1 = f'{r_id} {ttl}'
-
-    evar = rinfo.entity_type
-    svar = rinfo.sub_type
-    ns2 = f'[{evar} {svar}]'
-
-    ns3 = make_season_episode_str(rinfo.episode_number, rinfo.season_number)
-
-    if evar == 'Episode':
-        tmp_s = f'{ns1} - {ns3} - {ettl} - {ns2}'
-    else:
-        tmp_s = f'{ns1} - {ns2}'
-
-    ns1 = re.match(r'\d+', rinfo.resolution_title)
-    ns2 = 'TVRip'
-    try:
-        if int(ns1.group(0)) > 480:  # noqa: WPS432
-            ns2 = 'HDRip'
-    except ValueError:
-        pass  # noqa: WPS420
-
-    return sanitize_filename(f'{tmp_s} [{ns2}]')
+    return _format_filename(r_id, recording_getter(rinfo))
 
 
 def make_season_episode_str(evar: str, svar: str) -> str:  # noqa: C901
@@ -177,77 +225,120 @@ def make_season_episode_str(evar: str, svar: str) -> str:  # noqa: C901
     return svar + evar
 
 
-def make_filename_rdict(r_id: int, rd: dict) -> str:
+def make_filename_rdict(
+    r_id: int,
+    rd: 'sqlite3.Row | Mapping[str, Any]',
+) -> str:
     """Generate a filename for the recording described by rd."""
-    ttl = rd.get('title')
-    ettl = rd.get('episodeTitle')
-    ns1 = f'{r_id} {ttl}'
+    return _format_filename(r_id, recording_getter(rd))
 
-    evar = rd.get('entityType')
-    svar = rd.get('subType')
-    ns2 = f'[{evar} {svar}]'
 
-    ns3 = make_season_episode_str(rd.get('episodeNum'), rd.get('seasonNum'))
+@lru_cache(maxsize=4)
+def _load_db(
+    db_file: pathlib.Path,
+) -> tuple['RecordingTable', dict[int, sqlite3.Row]]:
+    """Read (once) the recordings and the channel index from the Tablo db."""
+    recordings = read_recordings_columnar(db_file)
+    channels_by_id = index_by_id(iter_channels(db_file))
+    return recordings, channels_by_id
 
-    if evar == 'Episode':
-        tmp_s = f'{ns1} - ${ns3} - {ettl} - {ns2}'
-    else:
-        tmp_s = f'{ns1} - ${ns3} - {ns2}'
 
-    ns3 = 'TVRip'
-    ns2 = ''
-    ns1 = rd.get('resolution_title')
-    if ns1:
-        ns2 = re.match(r'\d+', ns1)
+def _recording_dir_ids(rec_root: str) -> frozenset[int]:
+    """Return the recording ids that have a directory under rec_root."""
     try:
-        if int(ns2) > 480:  # noqa: 432
-            ns3 = 'HDRip'
-    except ValueError:
-        pass  # noqa: WPS420
+        with os.scandir(rec_root) as entries:
+            # isdecimal, unlike isdigit, only accepts what int() can parse
+            return frozenset(
+                int(entry.name) for entry in entries
+                if entry.name.isdecimal() and entry.is_dir()
+            )
+    except OSError as exc:
+        # missing, not a directory, unreadable...: no recording dirs
+        logger.warning(f'Unable to list recordings in {rec_root}: {exc}')
+        return frozenset()
 
-    return sanitize_filename(f'{tmp_s} [{ns3}]')
+
+def _probe_one(
+    recordings: 'RecordingTable',
+    channels_by_id: dict[int, sqlite3.Row],
+    rec_root: str,
+    rec_ids: frozenset[int],
+    r_id: int,
+) -> Optional[tuple[int, str, int, 'Recording']]:
+    """Gather the information read_all reports for a single recording."""
+    # make the full recording path by adding /recording_id, "/segs"; kept
+    # as a plain string since it only goes to os.scandir
+    recording_path = os.path.join(rec_root, str(r_id), 'segs')
+    has_dir = r_id in rec_ids
+    try:
+        rinfo = get_recording_info(
+            recordings,
+            channels_by_id,
+            r_id,
+        )
+    except Exception as exc:
+        fn = make_filename_rdict(r_id, recordings.get(r_id))
+        tsnum = ts_count_or_none(recording_path) if has_dir else None
+        if tsnum is not None:
+            logger.error(f'Got an exception for {fn} ({tsnum}) {exc}')
+        else:
+            logger.warning(
+                f'Got an exception (but no segment dir) for {fn} {exc}',
+            )
+        return None
+
+    fn = make_filename_rinfo(r_id, rinfo)
+    tsnum = ts_count_or_none(recording_path) if has_dir else None
+    if tsnum is not None:
+        return (r_id, fn, tsnum, rinfo)
+    logger.warning(f'No segment dir: {fn}')
+    return None
 
 
 def read_all(
     db_file: pathlib.Path,
     tablo_mount_path: pathlib.Path,
-) -> tuple[int, str, int, 'Recording']:
+    workers: int = 1,
+) -> Iterator[tuple[int, str, int, 'Recording']]:
     """Read information about all recordings in Tablo db."""
-    recording_data = read_recordings(db_file)
-    channel_data = read_channels(db_file)
-    for rd in recording_data:
-        r_id = rd.get('ID')
-        # make the full recording path by adding /rec , /recording_id, "/segs"
-        recording_path = tablo_mount_path.joinpath('rec', str(r_id), 'segs')
-        try:
-            rinfo = get_recording_info(
-                recording_data,
-                channel_data,
-                r_id,
-            )
-        except Exception as exc:
-            fn = make_filename_rdict(r_id, rd)
-            if recording_path.exists():
-                tsnum = count_ts_files(recording_path)
-                logger.error(f'Got an exception for {fn} ({tsnum}) {exc}')
-            else:
-                logger.warning(
-                    f'Got an exception (but no segment dir) for {fn} {exc}',
-                )
-            continue
-
-        fn = make_filename_rinfo(r_id, rinfo)
-        if recording_path.exists():
-            tsnum = count_ts_files(recording_path)
-            yield (r_id, fn, tsnum, rinfo)
-        else:
-            logger.warning(f'No segment dir: {fn}')
+    recordings, channels_by_id = _load_db(db_file)
+    rec_root = os.path.join(tablo_mount_path, 'rec')
+    probe = partial(
+        _probe_one,
+        recordings,
+        channels_by_id,
+        rec_root,
+        _recording_dir_ids(rec_root),
+    )
+    if workers <= 1:
+        results = map(probe, recordings.ids)
+        yield from filter(None, results)
+        return
+
+    # overlap the stat/readdir latency of slow (USB) drives; map() keeps
+    # the results in title order
+    executor = ThreadPoolExecutor(max_workers=workers)
+    try:
+        yield from filter(None, executor.map(probe, recordings.ids))
+    finally:
+        executor.shutdown(cancel_futures=True)
+
+
+REPORT_BATCH_ROWS = 1024
 
 
 def report_all(db_file: pathlib.Path, tablo_mount_path: pathlib.Path) -> None:
     """Report information about all recordings in Tablo db."""
-    for r_id, fn, tsnum, _ in read_all(db_file, tablo_mount_path):
-        print(f'{r_id},{fn},{tsnum}')
+    rows = []
+    try:
+        for r_id, fn, tsnum, _ in read_all(db_file, tablo_mount_path):
+            rows.append(f'{r_id},{fn},{tsnum}\n')
+            if len(rows) >= REPORT_BATCH_ROWS:
+                sys.stdout.write(''.join(rows))
+                rows.clear()
+    finally:
+        # a scan that fails part way still reports what it found
+        sys.stdout.write(''.join(rows))
 
 
 def report_from_list(
@@ -256,23 +347,27 @@ def report_from_list(
     recording_id_list: list[int],
 ) -> None:
     """Show detailed information about one or more individual records."""
+    # each Recording is built, and any error about it logged, only as the
+    # loop reaches it, so messages stay in order
+    recording_info = iter_some_recordings_info(tablo_db, recording_id_list)
     for count, r_id in enumerate(recording_id_list):
         logger.success(
             f'Processing recording {r_id} ' +
             f'({count+1} of {len(recording_id_list)})',
         )
-        rinfo = get_single_recording_info(tablo_db, r_id)
+        rinfo = next(recording_info)
         if rinfo:
             recording_path = tablo_mount_path.joinpath('rec', str(r_id), 'segs')
-            tsnum = 0
-            if recording_path.exists():
-                tsnum = count_ts_files(recording_path)
-            else:
+            tsnum = ts_count_or_none(recording_path)
+            if tsnum is None:
+                tsnum = 0
                 logger.warning(f'No TS files found for {r_id}')
-            print(f'Recording {r_id} has {tsnum} segments')
-            print(json.dumps(asdict(rinfo), indent=4))
+            sys.stdout.write(
+                f'Recording {r_id} has {tsnum} segments\n' +
+                f'{json.dumps(asdict(rinfo), indent=4)}\n',
+            )
         else:
-            logger.error('Unable to retrieve information for {r_id}')
+            logger.error(f'Unable to retrieve information for {r_id}')
 
 
 def rescue_recording(
@@ -314,48 +409,92 @@ def rescue_recording(
     return 0, outfile
 
 
+class RescueOptions(NamedTuple):
+    """Where to put rescued recordings, and how to rescue them."""
+
+    outdir: pathlib.Path
+    overwrite: bool = False
+    jobs: int = 1
+
+
+# (r_id, rinfo, progress) of each recording found, and (r_id, rc, outfile)
+# of each recording rescued
+_Found = Iterable[tuple[int, 'Recording', str]]
+_Rescued = tuple[int, int, Optional[pathlib.Path]]
+
+
+def _rescue_concurrently(
+    rescue: Callable[..., tuple],
+    jobs: int,
+    found: _Found,
+) -> Iterator[_Rescued]:
+    """Rescue up to jobs of the recordings found at once."""
+    # the work is done by ffmpeg/mp4tags subprocesses, so threads suffice
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        pending = {}
+        for r_id, rinfo, progress in found:
+            logger.success(f'Queueing recording {r_id} ({progress})')
+            future = executor.submit(rescue, {r_id: rinfo}, r_id=r_id)
+            pending[future] = r_id
+        for done in as_completed(pending):
+            yield (pending[done], *done.result())
+
+
+def _rescue_each(
+    mount_path: pathlib.Path,
+    options: RescueOptions,
+    found: _Found,
+) -> Iterator[_Rescued]:
+    """Rescue each (r_id, rinfo, progress) found; yield (r_id, rc, outfile)."""
+    rescue = partial(
+        rescue_recording,
+        mount_path,
+        overwrite=options.overwrite,
+        outdir=options.outdir,
+    )
+    if options.jobs > 1:
+        yield from _rescue_concurrently(rescue, options.jobs, found)
+        return
+
+    # rescue each recording as soon as it is found
+    for r_id, rinfo, progress in found:
+        logger.success(f'Processing recording {r_id} ({progress})')
+        yield (r_id, *rescue({r_id: rinfo}, r_id=r_id))
+
+
 def rescue_from_list(
     tablo_db: pathlib.Path,
     mount_path: pathlib.Path,
-    outdir: pathlib.Path,
     recording_id_list: list[int],
-    overwrite: bool,
+    options: RescueOptions,
 ) -> bool:
-    """Rescue one or more individual records."""
+    """Rescue one or more individual records, as options direct."""
     rescued = {}
-    skipped = {}
-    for count, r_id in enumerate(recording_id_list):
-        logger.success(
-            f'Processing recording {r_id} ' +
-            f'({count+1} of {len(recording_id_list)})',
+    outcome = {}
+    found = (
+        (r_id, rinfo, f'{count} of {len(recording_id_list)}')
+        for count, (r_id, rinfo) in enumerate(
+            zip(
+                recording_id_list,
+                iter_some_recordings_info(tablo_db, recording_id_list),
+            ),
+            start=1,
         )
-        rinfo = get_single_recording_info(tablo_db, r_id)
-        if rinfo:
-            rc, outfile = rescue_recording(
-                mount_path,
-                {r_id: rinfo},
-                overwrite,
-                r_id,
-                outdir,
-            )
-            if outfile:
-                if rc == 0:
-                    rescued[r_id] = outfile
-                elif rc == -2:
-                    skipped[r_id] = outfile
+        if rinfo
+    )
+    for r_id, rc, outfile in _rescue_each(mount_path, options, found):
+        if outfile:
+            if rc == 0:
+                rescued[r_id] = outfile
+                outcome[r_id] = f'Rescued:       {r_id} = {outfile}'
+            elif rc == -2:
+                outcome[r_id] = f'Skipped:       {r_id} = {outfile}'
 
     logger.success(f'Rescued {len(rescued)} recordings.')
 
     # Report on each specific item:
     for r_id in recording_id_list:
-        if r_id in rescued.keys():
-            outfile = rescued[r_id]
-            print(f'Rescued:       {r_id} = {outfile}')
-        elif r_id in skipped.keys():
-            outfile = skipped[r_id]
-            print(f'Skipped:       {r_id} = {outfile}')
-        else:
-            print(f'Rescue failed: {r_id}')
+        print(outcome.get(r_id, f'Rescue failed: {r_id}'))
 
     return len(rescued)
 
@@ -363,35 +502,24 @@ def rescue_from_list(
 def rescue_all(
     tablo_db: pathlib.Path,
     mount_path: pathlib.Path,
-    outdir: pathlib.Path,
-    overwrite: bool,
+    options: RescueOptions,
 ) -> bool:
-    """Rescue all available recordings."""
-    recording_info = {}
-    for r_id, _, _, rinfo in read_all(tablo_db, mount_path):
-        recording_info[r_id] = rinfo
-        logger.info('Found {len(recording_info)} recordings')
-
+    """Rescue all available recordings, as options direct."""
     rescued = {}
-    skipped = {}
-    for count, r_id in enumerate(recording_info.keys()):
-        logger.success(
-            f'Processing recording {r_id} ' +
-            f'({count+1} of {len(recording_info)})',
+    found = (
+        (r_id, rinfo, f'#{position}')
+        for position, (r_id, _, _, rinfo) in enumerate(
+            read_all(tablo_db, mount_path),
+            start=1,
         )
-        rc, outfile = rescue_recording(
-            mount_path,
-            recording_info,
-            overwrite,
-            r_id,
-            outdir,
-        )
-        if outfile:
-            if rc == 0:
-                rescued[r_id] = outfile
-            elif rc == -2:
-                skipped[r_id] = outfile
+    )
+    found_count = 0
+    for r_id, rc, outfile in _rescue_each(mount_path, options, found):
+        found_count += 1
+        if outfile and rc == 0:
+            rescued[r_id] = outfile
 
+    logger.info(f'Found {found_count} recordings')
     logger.success(f'Rescued {len(rescued)} recordings.')
     return len(rescued)
 
@@ -414,20 +542,14 @@ def real_main(opts: argparse.Namespace) -> bool:
         report_all(tablo_db, mount_path)
         return True
 
-    if opts.id:
-        return rescue_from_list(
-            tablo_db,
-            mount_path,
-            pathlib.Path(opts.outdir).absolute(),
-            opts.id,
-            overwrite=opts.force,
-        )
-    return rescue_all(
-        tablo_db,
-        mount_path,
+    options = RescueOptions(
         pathlib.Path(opts.outdir).absolute(),
         overwrite=opts.force,
+        jobs=opts.jobs,
     )
+    if opts.id:
+        return rescue_from_list(tablo_db, mount_path, opts.id, options)
+    return rescue_all(tablo_db, mount_path, options)
 
 
 def main(cli_args: Optional[list[str]] = None) -> int:
@@ -0,0 +1,145 @@
+"""Tests for segment durations and the concat list in tablo_saver.merge."""
+import pathlib
+import tempfile
+from typing import Optional
+from unittest import TestCase, main, mock
+
+from tablo_saver import merge
+
+# the private helpers under test
+iter_pcrs = merge._iter_pcrs  # noqa: WPS437
+ts_duration = merge._ts_duration  # noqa: WPS437
+segment_duration = merge._segment_duration  # noqa: WPS437
+PCR_WRAP = merge._PCR_WRAP  # noqa: WPS437
+
+VIDEO_PID = 0x100
+OTHER_PID = 0x200
+
+
+def ts_packet(pid: int, pcr: Optional[int] = None) -> bytes:
+    """Build a 188-byte TS packet, with a PCR adaptation field if given."""
+    packet = bytearray(merge.TS_PACKET_SIZE)
+    packet[0] = merge.TS_SYNC_BYTE
+    packet[1] = (pid >> 8) & 0x1F
+    packet[2] = pid & 0xFF
+    if pcr is None:
+        packet[3] = 0x10  # payload only
+        return bytes(packet)
+    packet[3] = 0x30  # adaptation field and payload
+    packet[4] = 7  # adaptation field length
+    packet[5] = 0x10  # PCR_flag
+    packet[6] = (pcr >> 25) & 0xFF
+    packet[7] = (pcr >> 17) & 0xFF
+    packet[8] = (pcr >> 9) & 0xFF
+    packet[9] = (pcr >> 1) & 0xFF
+    packet[10] = ((pcr & 1) << 7) | 0x7E  # reserved bits, extension = 0
+    return bytes(packet)
+
+
+def ts_stream(pcrs: list[int], gap: int = 49) -> bytes:
+    """Build a stream carrying pcrs on VIDEO_PID, gap packets apart."""
+    packets = []
+    for pcr in pcrs:
+        packets.append(ts_packet(VIDEO_PID, pcr))
+        packets.append(ts_packet(OTHER_PID, 12345))
+        packets.extend(ts_packet(VIDEO_PID) for _ in range(gap))
+    return b''.join(packets)
+
+
+class IterPcrsTest(TestCase):
+    """Tests for _iter_pcrs."""
+
+    def test_reads_pid_and_full_pcr_base(self):
+        """Every PCR is reported with its PID, including the top bit."""
+        pcrs = [0, 1, PCR_WRAP - 1]
+        found = list(iter_pcrs(ts_stream(pcrs, gap=2)))
+        self.assertEqual(
+            [(pid, pcr) for pid, pcr in found if pid == VIDEO_PID],
+            [(VIDEO_PID, pcr) for pcr in pcrs],
+        )
+        self.assertIn((OTHER_PID, 12345), found)
+
+    def test_buffer_starting_mid_packet(self):
+        """A buffer cut mid-packet resyncs on the next packet boundary."""
+        stream = ts_stream([1000, 2000, 3000], gap=3)
+        found = list(iter_pcrs(stream[100:]))
+        self.assertEqual(
+            [pcr for pid, pcr in found if pid == VIDEO_PID],
+            [2000, 3000],
+        )
+
+    def test_no_sync(self):
+        """A buffer without packet sync yields nothing."""
+        self.assertEqual(
+            list(iter_pcrs(bytes(4 * merge.TS_PACKET_SIZE))),
+            [],
+        )
+
+
+class TsDurationTest(TestCase):
+    """Tests for _ts_duration and the ffprobe fallback."""
+
+    def setUp(self):
+        """Create a scratch directory for the segments."""
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmpdir.cleanup)
+
+    def write_segment(self, stream: bytes) -> pathlib.Path:
+        """Write stream to a .ts file and return its path."""
+        ts_file = pathlib.Path(self._tmpdir.name, 'seg.ts')
+        ts_file.write_bytes(stream)
+        return ts_file
+
+    def test_span(self):
+        """The duration is the span from the first to the last PCR."""
+        pcrs = [900000 + idx * 9000 for idx in range(101)]  # 10 s
+        ts_file = self.write_segment(b''.join((b'\x00\x01', ts_stream(pcrs))))
+        self.assertAlmostEqual(ts_duration(ts_file), 10.0)
+
+    def test_wraparound(self):
+        """The span is measured modulo the 33-bit PCR base."""
+        start = PCR_WRAP - 45000
+        pcrs = [(start + idx * 9000) % PCR_WRAP for idx in range(21)]
+        ts_file = self.write_segment(ts_stream(pcrs))
+        self.assertAlmostEqual(ts_duration(ts_file), 2.0)
+
+    def test_pcrs_at_max_interval_and_atsc_rate(self):
+        """Segments with PCRs at the maximum spacing are still measured."""
+        # 100 ms of a 19.39 Mbps stream is 1289 packets from PCR to PCR
+        gap = 19392658 // 8 // 10 // merge.TS_PACKET_SIZE - 2
+        pcrs = [idx * 9000 for idx in range(4)]
+        ts_file = self.write_segment(ts_stream(pcrs, gap=gap))
+        self.assertAlmostEqual(ts_duration(ts_file), 0.3)
+
+    def test_no_pcr_falls_back_to_ffprobe(self):
+        """Without a PCR, the duration comes from ffprobe."""
+        stream = b''.join(ts_packet(VIDEO_PID) for _ in range(100))
+        ts_file = self.write_segment(stream)
+        with self.assertRaises(ValueError):
+            ts_duration(ts_file)
+        with mock.patch.object(merge, 'get_duration', return_value=4.5):
+            self.assertEqual(segment_duration(ts_file), 4.5)
+
+
+class SegmentListTest(TestCase):
+    """Tests for the concat list fed to ffmpeg."""
+
+    def test_entry_format(self):
+        """Entries name file: URLs, with quotes in the path escaped."""
+        ts_files = [
+            pathlib.Path('/mnt/rec/1/segs/00001.ts'),
+            pathlib.Path("/mnt/Bob's drive/00002.ts"),
+        ]
+        durations = {ts_files[0]: 6.0, ts_files[1]: None}
+        with mock.patch.object(
+            merge, '_segment_duration', side_effect=durations.get,
+        ):
+            lines = list(merge.prepare_segment_list(ts_files))
+        self.assertEqual(lines, [
+            "file 'file:/mnt/rec/1/segs/00001.ts'\nduration 5.5\n",
+            "file 'file:/mnt/Bob'\\''s drive/00002.ts'\n",  # noqa: WPS342
+        ])
+
+
+if __name__ == '__main__':
+    main()